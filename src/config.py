@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import cached_property
 import math
 
 
@@ -31,18 +32,18 @@ class NBFTConfig:
     inprep2_deadline_sec: float = 1.0
     mal_nodes: int = 0
 
-    @property
+    @cached_property
     def E(self) -> int:
         return (self.m - 1) // 3
 
-    @property
+    @cached_property
     def R(self) -> int:
         return math.ceil(self.n / self.m)
 
-    @property
+    @cached_property
     def omega(self) -> int:
         return max(0, (self.R - 1) // 3)
 
-    @property
+    @cached_property
     def redis_url(self) -> str:
         return "redis://localhost:6379/0"
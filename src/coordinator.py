@@ -1,9 +1,8 @@
 import asyncio
-import time
 import math
 from collections import defaultdict
-import redis.asyncio as redis
 from messages import PrePrepare1
+from redis_client import RedisClient, rep_group_name
 
 
 class Coordinator:
@@ -19,31 +18,36 @@ class Coordinator:
         self.cfg = cfg
         self.groups = groups
         self.reps = reps
-        self.r = redis.from_url(cfg.redis_url)
+        self.r = RedisClient.get_client(cfg.redis_url)
         self.logger = logger
+        self._groups_mapping = {
+            nid: str(gid) for gid, g in enumerate(groups) for nid in g
+        }
+        self._reps_mapping = {str(gid): nid for gid, nid in reps.items()}
 
     async def store_round_config(self, rid, node_ids):
         await self._clean_redis(rid)
 
-        await self.r.hset(
-            f"nbft:round:{rid}:config",
-            mapping={
-                "n": self.cfg.n,
-                "m": self.cfg.m,
-                "R": self.cfg.R,
-                "E": self.cfg.E,
-                "omega": self.cfg.omega,
-                "view": self.cfg.view_number,
-                "prev": self.cfg.previous_hash,
-            },
-        )
-        await self.r.hset(
-            f"nbft:groups:{rid}",
-            mapping={nid: str(gid) for gid, g in enumerate(self.groups) for nid in g},
-        )
-        await self.r.hset(
-            f"nbft:rep:{rid}", mapping={str(gid): nid for gid, nid in self.reps.items()}
-        )
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                f"nbft:round:{rid}:config",
+                mapping={
+                    "n": self.cfg.n,
+                    "m": self.cfg.m,
+                    "R": self.cfg.R,
+                    "E": self.cfg.E,
+                    "omega": self.cfg.omega,
+                    "view": self.cfg.view_number,
+                    "prev": self.cfg.previous_hash,
+                },
+            )
+            pipe.hset(f"nbft:groups:{rid}", mapping=self._groups_mapping)
+            pipe.hset(f"nbft:rep:{rid}", mapping=self._reps_mapping)
+            for gid in range(len(self.groups)):
+                pipe.xgroup_create(
+                    f"nbft:inprep1:{gid}", rep_group_name(gid), id="0", mkstream=True
+                )
+            await pipe.execute()
 
     def group_weight(self, valid_sigs, is_rep=True, msg_valid=True):
         """
@@ -59,30 +63,76 @@ class Coordinator:
         if is_rep:
             if valid_sigs >= threshold:
                 self.logger.info(
-                    f"[COORD] Retuning group with full weight (valid_sigs={valid_sigs} ≥ threshold={threshold}) -> {m} votes"
+                    "[COORD] Retuning group with full weight (valid_sigs=%s ≥ threshold=%s) -> %s votes",
+                    valid_sigs,
+                    threshold,
+                    m,
                 )
                 return m
             else:
                 self.logger.info(
-                    f"[COORD] Group below threshold (valid_sigs={valid_sigs} < threshold={threshold}) -> {valid_sigs} votes"
+                    "[COORD] Group below threshold (valid_sigs=%s < threshold=%s) -> %s votes",
+                    valid_sigs,
+                    threshold,
+                    valid_sigs,
                 )
                 return valid_sigs
         else:
             return valid_sigs
 
     async def _clean_redis(self, rid):
+        gids = range(len(self.groups))
+        keys = (
+            [f"nbft:alerts:{rid}:{gid}" for gid in gids]
+            + [f"nbft:inprep1:{gid}" for gid in gids]
+            + [f"nbft:inprep2:{gid}" for gid in gids]
+            + [
+                f"nbft:rep_votes:{rid}",
+                f"nbft:decisions:{rid}",
+                "nbft:commit",
+                "nbft:outprepare",
+                "nbft:preprepare1",
+                "nbft:preprepare2",
+            ]
+        )
+        await self.r.delete(*keys)
 
-        for gid in range(len(self.groups)):
-            await self.r.delete(f"nbft:alerts:{rid}:{gid}")
-            await self.r.delete(f"nbft:inprep1:{gid}")
-            await self.r.delete(f"nbft:inprep2:{gid}")
-
-        await self.r.delete(f"nbft:rep_votes:{rid}")
-        await self.r.delete(f"nbft:decisions:{rid}")
-        await self.r.delete("nbft:commit")
-        await self.r.delete("nbft:outprepare")
-        await self.r.delete("nbft:preprepare1")
-        await self.r.delete("nbft:preprepare2")
+    async def _collect_aggregates(self, rid, aggregates, deadline):
+        """
+        Blocks on every group's inprep2 stream and fills `aggregates` in place,
+        returning as soon as each group has reported for this round.
+        `deadline` is an event-loop (monotonic) time; the caller bounds the
+        call with it.
+        """
+        loop = asyncio.get_running_loop()
+        streams = {f"nbft:inprep2:{gid}": gid for gid in range(len(self.groups))}
+        last_ids = {stream: "0-0" for stream in streams}
+
+        while len(aggregates) < len(self.groups):
+            remaining_ms = int((deadline - loop.time()) * 1000)
+            resp = await self.r.xread(
+                {s: last_ids[s] for s, gid in streams.items() if gid not in aggregates},
+                block=max(1, remaining_ms),
+            )
+            for stream, msgs in resp or []:
+                gid = streams[stream]
+                for msg_id, fields in msgs:
+                    last_ids[stream] = msg_id
+                    if gid in aggregates or int(fields["rid"]) != rid:
+                        continue
+                    aggregates[gid] = {
+                        "rep": fields["rep_id"],
+                        "value": fields["value"],
+                        "valid_sigs": int(fields["valid_sigs"]),
+                    }
+                    self.logger.info(
+                        "[COORD] Received aggregate from group %s: "
+                        "rep=%s, value=%s, valid_sigs=%s",
+                        gid,
+                        aggregates[gid]["rep"],
+                        aggregates[gid]["value"],
+                        aggregates[gid]["valid_sigs"],
+                    )
 
     async def run_round(self, rid: int, value: str):
 
@@ -90,89 +140,90 @@ class Coordinator:
         pre = PrePrepare1(rid, primary, value)
         await self.r.xadd("nbft:preprepare1", pre.to_fields())
 
-        deadline = time.time() + self.cfg.inprep2_deadline_sec + 0.7
         aggregates = {}
         self.logger.info("[COORD] Waiting for group aggregates...")
 
-        while time.time() < deadline and len(aggregates) < len(self.groups):
-            for gid in range(len(self.groups)):
-                if gid in aggregates:
-                    continue
-                resp = await self.r.xrevrange(f"nbft:inprep2:{gid}", count=1)
-                if resp:
-                    _, fields = resp[0]
-                    if int(fields[b"rid"]) == rid:
-                        aggregates[gid] = {
-                            "rep": fields[b"rep_id"].decode(),
-                            "value": fields[b"value"].decode(),
-                            "valid_sigs": int(fields[b"valid_sigs"]),
-                        }
-                        self.logger.info(
-                            f"[COORD] Received aggregate from group {gid}: "
-                            f"rep={aggregates[gid]['rep']}, value={aggregates[gid]['value']}, "
-                            f"valid_sigs={aggregates[gid]['valid_sigs']}"
-                        )
-            await asyncio.sleep(0.05)
+        deadline = asyncio.get_running_loop().time() + self.cfg.inprep2_deadline_sec
+        try:
+            await asyncio.wait_for(
+                self._collect_aggregates(rid, aggregates, deadline),
+                timeout=self.cfg.inprep2_deadline_sec,
+            )
+        except asyncio.TimeoutError:
+            pass
 
         if not aggregates:
             self.logger.warning("[COORD] No aggregates received before timeout!")
 
         self.logger.info("\n")
 
+        async with self.r.pipeline(transaction=False) as pipe:
+            for gid in range(len(self.groups)):
+                pipe.xrange(f"nbft:alerts:{rid}:{gid}", "-", "+")
+            all_alerts = await pipe.execute()
+
         exclude = set()
-        for gid in range(len(self.groups)):
-            alerts = await self.r.xrange(f"nbft:alerts:{rid}:{gid}", "-", "+")
+        for gid, alerts in enumerate(all_alerts):
             relevant = [
                 a
                 for a in alerts
-                if b"group_id" in a[1] and int(a[1][b"group_id"]) == gid
+                if "group_id" in a[1] and int(a[1]["group_id"]) == gid
             ]
             if relevant:
                 exclude.add(gid)
                 self.logger.warning(
-                    f"[COORD] Excluding group {gid} due to {len(relevant)} relevant alerts"
+                    "[COORD] Excluding group %s due to %s relevant alerts",
+                    gid,
+                    len(relevant),
                 )
 
-        agreed_groups = []
         group_results = {}
+        counts = defaultdict(int)
+        valid_groups = 0
+        winner, group_votes = "⊥", 0
+        quorum = 2 * self.cfg.E + 1
 
         for gid, agg in aggregates.items():
             if gid in exclude:
                 continue
-            group_results[gid] = agg["value"]
-            if agg["valid_sigs"] >= (2 * self.cfg.E + 1):
-                agreed_groups.append(agg["value"])
-
-        counts = defaultdict(int)
-        for val in agreed_groups:
-            counts[val] += 1
+            val = agg["value"]
+            group_results[gid] = val
+            if agg["valid_sigs"] >= quorum:
+                valid_groups += 1
+                counts[val] += 1
+                if counts[val] > group_votes:
+                    winner, group_votes = val, counts[val]
 
         total_groups = len(self.groups)
-        valid_groups = len(agreed_groups)
         threshold_groups = total_groups - self.cfg.omega
-
-        winner, group_votes = max(
-            counts.items(), key=lambda kv: kv[1], default=("⊥", 0)
-        )
         consensus_reached = group_votes >= threshold_groups
 
         self.logger.info("\n")
-        self.logger.info(f"[COORD] Group results: {group_results}")
+        self.logger.info("[COORD] Group results: %s", group_results)
         self.logger.info(
-            f"{valid_groups}/{total_groups} groups " f"reached internal consensus."
+            "%s/%s groups reached internal consensus.", valid_groups, total_groups
         )
         self.logger.info(
-            f"[COORD] Tally: {dict(counts)}, threshold={threshold_groups}, "
-            f"winner='{winner}', group_votes={group_votes}"
+            "[COORD] Tally: %s, threshold=%s, winner='%s', group_votes=%s",
+            dict(counts),
+            threshold_groups,
+            winner,
+            group_votes,
         )
 
         if consensus_reached:
             self.logger.info(
-                f"[COORD] ✅ Global consensus reached: value='{winner}' "
-                f"({group_votes}/{total_groups} groups agreed)."
+                "[COORD] ✅ Global consensus reached: value='%s' "
+                "(%s/%s groups agreed).",
+                winner,
+                group_votes,
+                total_groups,
             )
         else:
             self.logger.warning(
-                f"[COORD] ❌ Consensus not reached "
-                f"({group_votes}/{total_groups} groups agreed, threshold={threshold_groups})."
+                "[COORD] ❌ Consensus not reached "
+                "(%s/%s groups agreed, threshold=%s).",
+                group_votes,
+                total_groups,
+                threshold_groups,
             )
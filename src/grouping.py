@@ -10,23 +10,9 @@ def assign_groups(node_ids, cfg, logger):
     """
     ring = HashRing(node_ids)
     start_key = f"{cfg.view_number}_{len(node_ids)}"
-    walk = ring.clockwise_walk(start_key)
-
-    groups = [[] for _ in range(cfg.R)]
-    assigned = set()
-
-    for i in range(cfg.R):
-        for _ in range(cfg.m):
-            try:
-                nid = next(walk)
-                while nid in assigned:
-                    nid = next(walk)
-                groups[i].append(nid)
-                assigned.add(nid)
-                if len(assigned) >= len(node_ids):
-                    break
-            except StopIteration:
-                break
+    order = list(dict.fromkeys(ring.rotated(start_key)))
+
+    groups = [order[i * cfg.m : (i + 1) * cfg.m] for i in range(cfg.R)]
 
     return [g for g in groups if g]
 
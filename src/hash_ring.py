@@ -1,10 +1,10 @@
-import zlib
+import xxhash
 from bisect import bisect_right
 
 
 def h32(value: str) -> int:
-    """Computes a 32-bit hash using CRC32 for consistent hashing."""
-    return zlib.crc32(value.encode()) & 0xFFFFFFFF
+    """Computes a 32-bit hash using xxHash32 for consistent hashing."""
+    return xxhash.xxh32_intdigest(value.encode())
 
 
 class HashRing:
@@ -25,12 +25,9 @@ class HashRing:
             i = 0
         return self.nodes[i][1]
 
-    def clockwise_walk(self, start_key: str):
-        """Yields nodes in clockwise order starting from a key on the hash ring."""
-        hv = h32(start_key)
-        i = bisect_right(self.hashes, hv)
-        while True:
-            if i == len(self.nodes):
-                i = 0
-            yield self.nodes[i][1]
-            i += 1
+    def rotated(self, start_key: str) -> list:
+        """Returns all nodes in clockwise order starting from a key on the hash ring."""
+        if not self.nodes:
+            return []
+        i = bisect_right(self.hashes, h32(start_key)) % len(self.nodes)
+        return [n for _, n in self.nodes[i:]] + [n for _, n in self.nodes[:i]]
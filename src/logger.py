@@ -1,5 +1,8 @@
 import os
+import queue
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from colorama import Style, init
 
 init(autoreset=True)
@@ -7,6 +10,7 @@ init(autoreset=True)
 
 class Logger:
     _loggers = {}
+    _queue = None
     _colors = [
         "\033[38;5;196m",  # red
         "\033[38;5;39m",  # blue
@@ -30,9 +34,36 @@ class Logger:
 
     @staticmethod
     def _color_for_name(name: str) -> str:
-        idx = hash(name) % len(Logger._colors)
+        idx = sum(map(ord, name)) % len(Logger._colors)
         return Logger._colors[idx]
 
+    @staticmethod
+    def _get_queue():
+        """
+        Starts the process-wide listener that performs file and console I/O
+        on a background thread; loggers only enqueue pre-formatted records.
+        """
+        if Logger._queue is not None:
+            return Logger._queue
+
+        log_dir = "logs"
+        os.makedirs(log_dir, exist_ok=True)
+        log_path = os.path.join(log_dir, "log.log")
+
+        message_formatter = logging.Formatter("%(message)s")
+        file_handler = logging.FileHandler(log_path, encoding="utf-8")
+        file_handler.setFormatter(message_formatter)
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(message_formatter)
+
+        Logger._queue = queue.SimpleQueue()
+        listener = QueueListener(
+            Logger._queue, file_handler, console_handler, respect_handler_level=True
+        )
+        listener.start()
+        atexit.register(listener.stop)
+        return Logger._queue
+
     @staticmethod
     def get_logger(log_name: str):
         if log_name in Logger._loggers:
@@ -42,21 +73,13 @@ class Logger:
         logger.setLevel(logging.INFO)
         logger.propagate = False
 
-        log_dir = "logs"
-        os.makedirs(log_dir, exist_ok=True)
-        log_path = os.path.join(log_dir, "log.log")
-
         color = Logger._color_for_name(log_name)
-        file_handler = logging.FileHandler(log_path, encoding="utf-8")
-        file_formatter = logging.Formatter(
+        color_formatter = logging.Formatter(
             f"{color}%(asctime)s - %(name)s - %(levelname)s - %(message)s{Style.RESET_ALL}"
         )
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(file_formatter)
-        logger.addHandler(console_handler)
+        queue_handler = QueueHandler(Logger._get_queue())
+        queue_handler.setFormatter(color_formatter)
+        logger.addHandler(queue_handler)
 
         Logger._loggers[log_name] = logger
         return logger
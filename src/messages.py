@@ -1,21 +1,26 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 import time
 
 
-@dataclass
+@dataclass(slots=True)
 class PrePrepare1:
     """Initial proposal message broadcast by the primary node."""
 
     rid: int
     proposer: str
     value: str
-    ts: float = time.time()
+    ts: float = field(default_factory=time.time)
 
     def to_fields(self):
-        return {k: str(v) for k, v in asdict(self).items()}
+        return {
+            "rid": self.rid,
+            "proposer": self.proposer,
+            "value": self.value,
+            "ts": self.ts,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class InPrepare:
     """Local prepare message sent by each node within its group."""
 
@@ -24,13 +29,20 @@ class InPrepare:
     node_id: str
     value: str
     sig: str
-    ts: float = time.time()
+    ts: float = field(default_factory=time.time)
 
     def to_fields(self):
-        return {k: str(v) for k, v in asdict(self).items()}
+        return {
+            "rid": self.rid,
+            "group_id": self.group_id,
+            "node_id": self.node_id,
+            "value": self.value,
+            "sig": self.sig,
+            "ts": self.ts,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class RepAggregate:
     """Aggregated message of valid signatures produced by a group representative."""
 
@@ -40,13 +52,21 @@ class RepAggregate:
     value: str
     valid_sigs: int
     sigs_json: str
-    ts: float = time.time()
+    ts: float = field(default_factory=time.time)
 
     def to_fields(self):
-        return {k: str(v) for k, v in asdict(self).items()}
-
-
-@dataclass
+        return {
+            "rid": self.rid,
+            "group_id": self.group_id,
+            "rep_id": self.rep_id,
+            "value": self.value,
+            "valid_sigs": self.valid_sigs,
+            "sigs_json": self.sigs_json,
+            "ts": self.ts,
+        }
+
+
+@dataclass(slots=True)
 class Alert:
     """
     Alert message used in the Node Decision Broadcast Model.
@@ -58,7 +78,14 @@ class Alert:
     node_id: str
     reason: str
     evidence: str
-    ts: float = time.time()
+    ts: float = field(default_factory=time.time)
 
     def to_fields(self):
-        return {k: str(v) for k, v in asdict(self).items()}
+        return {
+            "rid": self.rid,
+            "group_id": self.group_id,
+            "node_id": self.node_id,
+            "reason": self.reason,
+            "evidence": self.evidence,
+            "ts": self.ts,
+        }
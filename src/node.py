@@ -1,7 +1,9 @@
-import asyncio, json, random, time
-import redis.asyncio as redis
+import asyncio, logging, random
+import orjson
+from collections import Counter
 from messages import InPrepare, RepAggregate, Alert
 from logger import Logger
+from redis_client import RedisClient, rep_group_name
 
 
 class Node:
@@ -11,68 +13,109 @@ class Node:
         self.group_id = group_id
         self.rep_id = rep_id
         self.honest = honest
-        self.r = redis.from_url(cfg.redis_url)
+        self.r = RedisClient.get_client(cfg.redis_url)
         self.logger = Logger.get_logger(str(node_id))
+        self._inprep1_stream = f"nbft:inprep1:{group_id}"
+        self._inprep2_stream = f"nbft:inprep2:{group_id}"
+        self._rep_group = rep_group_name(group_id)
+        self._rep_consumer = f"rep-{node_id}"
 
-    async def sign(self, payload: dict) -> str:
+    def sign(self, payload: dict) -> str:
         sig = f"sig:{self.id}:{payload.get('rid', '?')}"
         self.logger.info(
-            f"[SIGN | GROUP {self.group_id}] Signed '{payload.get('val')}'"
+            "[SIGN | GROUP %s] Signed '%s'", self.group_id, payload.get("val")
         )
         return sig
 
-    async def in_prepare1(self, rid, value):
-        stage = "IN_PREPARE1"
+    def build_inprepare1_fields(self, rid, value):
+        """
+        Signs this node's InPrepare vote and returns (stream_key, fields),
+        so callers can batch several nodes' votes into one pipeline.
+        """
         if not self.honest:
             # simulate malicious attempt
             value = f"BLOCK_FAKE_{self.id}"
-        sig = await self.sign({"rid": rid, "val": value})
+        sig = self.sign({"rid": rid, "val": value})
         msg = InPrepare(rid, self.group_id, self.id, value, sig)
-        await self.r.xadd(f"nbft:inprep1:{self.group_id}", msg.to_fields())
+        return self._inprep1_stream, msg.to_fields()
+
+    def log_inprepare1_sent(self, fields):
         self.logger.info(
-            f"[{stage} | GROUP {self.group_id}] Sent InPrepare (value={value})"
+            "[IN_PREPARE1 | GROUP %s] Sent InPrepare (value=%s)",
+            self.group_id,
+            fields["value"],
         )
 
-    async def in_prepare2_collect(self, rid, deadline_sec):
+    async def _collect_votes(self, seen, counts, deadline):
+        """
+        Reads the group's InPrepare votes into `seen` (node_id -> value) and
+        tallies them in `counts` until every member has voted or one value
+        holds both the 2E+1 quorum and a strict majority of the group, after
+        which the remaining votes can no longer change the outcome.
+        `deadline` is an event-loop (monotonic) time; the caller bounds the
+        call with it.
+        The consumer group is created by Coordinator.store_round_config;
+        without it XREADGROUP fails with NOGROUP.
+        """
         stage = "IN_PREPARE2"
-        if self.id != self.rep_id:
-            return None
-
-        start = time.time()
-        seen = {}
-        last_id = "0-0"
-
-        while time.time() - start < deadline_sec and len(seen) < self.cfg.m:
-            resp = await self.r.xread(
-                {f"nbft:inprep1:{self.group_id}": last_id}, count=50, block=200
+        twoEplus1 = 2 * self.cfg.E + 1
+        loop = asyncio.get_running_loop()
+        while len(seen) < self.cfg.m:
+            remaining_ms = int((deadline - loop.time()) * 1000)
+            resp = await self.r.xreadgroup(
+                self._rep_group,
+                self._rep_consumer,
+                {self._inprep1_stream: ">"},
+                count=self.cfg.m - len(seen),
+                block=max(1, remaining_ms),
+                noack=True,
             )
             if not resp:
                 continue
             for _, msgs in resp:
-                for msg_id, fields in msgs:
-                    last_id = msg_id
-                    gid = int(fields[b"group_id"])
-                    nid = fields[b"node_id"].decode()
-                    val = fields[b"value"].decode()
-                    if gid != self.group_id or nid in seen:
+                for _, fields in msgs:
+                    nid = fields["node_id"]
+                    val = fields["value"]
+                    if nid in seen:
                         continue
-                    seen[nid] = fields
-                    self.logger.info(
-                        f"[{stage} | GROUP {self.group_id} | REPRESENTATIVE] Received from {nid}: {val}"
-                    )
+                    seen[nid] = val
+                    counts[val] += 1
+                    if self.logger.isEnabledFor(logging.INFO):
+                        self.logger.info(
+                            "[%s | GROUP %s | REPRESENTATIVE] Received from %s: %s",
+                            stage,
+                            self.group_id,
+                            nid,
+                            val,
+                        )
+                    if counts[val] >= twoEplus1 and 2 * counts[val] > self.cfg.m:
+                        return
+
+    async def in_prepare2_collect(self, rid, deadline_sec):
+        """
+        Representative aggregation: collects the group's votes, publishes the
+        RepAggregate and returns (aggregate, alerts). Alerts are returned
+        rather than sent so the caller can publish every group's in one batch.
+        """
+        stage = "IN_PREPARE2"
+        if self.id != self.rep_id:
+            return None, []
+
+        seen = {}
+        counts = Counter()
+        deadline = asyncio.get_running_loop().time() + deadline_sec
+        timed_out = False
+        try:
+            await asyncio.wait_for(
+                self._collect_votes(seen, counts, deadline), timeout=deadline_sec
+            )
+        except asyncio.TimeoutError:
+            timed_out = True
 
         E = self.cfg.E
         twoEplus1 = 2 * E + 1
 
-        counts = {}
-        for f in seen.values():
-            v = f[b"value"].decode()
-            counts[v] = counts.get(v, 0) + 1
-
-        if counts:
-            majority_value, top_count = max(counts.items(), key=lambda kv: kv[1])
-        else:
-            majority_value, top_count = "⊥", 0
+        majority_value, top_count = counts.most_common(1)[0] if counts else ("⊥", 0)
 
         has_quorum = top_count >= twoEplus1
         value = majority_value if has_quorum else "⊥"
@@ -81,7 +124,10 @@ class Node:
         if not self.honest:
             value = f"BLOCK_FAKE_{self.id}"
             self.logger.warning(
-                f"[{stage} | GROUP {self.group_id} | MAL REP] Broadcasting malicious value '{value}' instead of group consensus."
+                "[%s | GROUP %s | MAL REP] Broadcasting malicious value '%s' instead of group consensus.",
+                stage,
+                self.group_id,
+                value,
             )
 
         agg = RepAggregate(
@@ -90,34 +136,38 @@ class Node:
             self.id,
             value,
             valid_sigs,
-            json.dumps(list(seen.keys())),
+            orjson.dumps(list(seen)).decode(),
         )
-        await self.r.xadd(f"nbft:inprep2:{self.group_id}", agg.to_fields())
 
+        await self.r.xadd(self._inprep2_stream, agg.to_fields())
+
+        alerts = []
         if self.honest:
             reasons = []
-            if time.time() - start >= deadline_sec:
+            if timed_out:
                 reasons.append("timeout")
             if not has_quorum:
                 if len(counts) > 1:
                     reasons.append("mismatch")
 
             for reason in reasons:
-                alert = Alert(
-                    rid,
-                    self.group_id,
-                    self.id,
-                    reason,
-                    f"valid_sigs={valid_sigs}, rep={self.rep_id}",
-                )
-                await self.r.xadd(
-                    f"nbft:alerts:{rid}:{self.group_id}", alert.to_fields()
+                alerts.append(
+                    Alert(
+                        rid,
+                        self.group_id,
+                        self.id,
+                        reason,
+                        f"valid_sigs={valid_sigs}, rep={self.rep_id}",
+                    )
                 )
                 self.logger.warning(
-                    f"[{stage} | GROUP {self.group_id}| REPRESENTATIVE] ALERT broadcasted ({reason}) - group didn't reach consensus."
+                    "[%s | GROUP %s| REPRESENTATIVE] ALERT raised (%s) - group didn't reach consensus.",
+                    stage,
+                    self.group_id,
+                    reason,
                 )
 
-        return agg
+        return agg, alerts
 
     async def verify_representative(self, rid):
         """
@@ -129,35 +179,28 @@ class Node:
             return
 
         stage = "VERIFY"
-        resp = await self.r.xrevrange(f"nbft:inprep2:{self.group_id}", count=1)
+        resp = await self.r.xrevrange(self._inprep2_stream, count=1)
         if not resp:
             return
 
         _, fields = resp[0]
-        rep_val = fields[b"value"].decode()
-        rep_id = fields[b"rep_id"].decode()
+        rep_val = fields["value"]
+        rep_id = fields["rep_id"]
 
-        msgs = await self.r.xrange(f"nbft:inprep1:{self.group_id}", min="-", max="+")
+        msgs = await self.r.xrange(self._inprep1_stream, min="-", max="+")
         seen = {}
         for msg_id, f in msgs:
-            gid = int(f[b"group_id"])
-            nid = f[b"node_id"].decode()
-            val = f[b"value"].decode()
-            if gid != self.group_id or nid in seen:
+            nid = f["node_id"]
+            val = f["value"]
+            if nid in seen:
                 continue
             seen[nid] = val
 
         E = self.cfg.E
         twoEplus1 = 2 * E + 1
 
-        counts = {}
-        for val in seen.values():
-            counts[val] = counts.get(val, 0) + 1
-
-        if counts:
-            majority_value, top_count = max(counts.items(), key=lambda kv: kv[1])
-        else:
-            majority_value, top_count = "⊥", 0
+        counts = Counter(seen.values())
+        majority_value, top_count = counts.most_common(1)[0] if counts else ("⊥", 0)
 
         has_quorum = top_count >= twoEplus1
         group_majority = majority_value if has_quorum else "⊥"
@@ -172,6 +215,10 @@ class Node:
             )
             await self.r.xadd(f"nbft:alerts:{rid}:{self.group_id}", alert.to_fields())
             self.logger.warning(
-                f"[{stage} | GROUP {self.group_id}] ALERT broadcasted (rep_mismatch): "
-                f"rep gave '{rep_val}' but group majority was '{group_majority}'."
+                "[%s | GROUP %s] ALERT broadcasted (rep_mismatch): "
+                "rep gave '%s' but group majority was '%s'.",
+                stage,
+                self.group_id,
+                rep_val,
+                group_majority,
             )
@@ -0,0 +1,28 @@
+import redis.asyncio as redis
+
+
+def rep_group_name(group_id) -> str:
+    """Consumer group a representative reads its group's InPrepare votes through."""
+    return f"repgrp-{group_id}"
+
+
+class RedisClient:
+    """
+    Hands out Redis clients backed by one connection pool per URL,
+    so every component in the process shares the same sockets.
+    """
+
+    _pools = {}
+
+    @staticmethod
+    def get_client(redis_url: str) -> redis.Redis:
+        pool = RedisClient._pools.get(redis_url)
+        if pool is None:
+            pool = redis.BlockingConnectionPool.from_url(
+                redis_url,
+                max_connections=64,
+                socket_keepalive=True,
+                decode_responses=True,
+            )
+            RedisClient._pools[redis_url] = pool
+        return redis.Redis(connection_pool=pool)
@@ -4,6 +4,12 @@ from grouping import assign_groups, pick_representative
 from node import Node
 from coordinator import Coordinator
 from logger import Logger
+from redis_client import RedisClient
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
 
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
 sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
@@ -41,12 +47,40 @@ async def main():
         value = "BLOCK_HASH_ABC"
         logger.info("[SYSTEM] Starting NBFT consensus round.\n")
 
-        await asyncio.gather(*[n.in_prepare1(rid, value) for n in nodes])
-
-        logger.info(f"\n")
-        await asyncio.gather(
-            *[n.in_prepare2_collect(rid, cfg.inprep2_deadline_sec) for n in nodes]
+        # Representatives start blocking on their group's stream before the
+        # votes land, so collection overlaps with the publish.
+        rep_task = asyncio.gather(
+            *[
+                n.in_prepare2_collect(rid, cfg.inprep2_deadline_sec)
+                for n in nodes
+                if n.id == n.rep_id
+            ]
         )
+
+        r = RedisClient.get_client(cfg.redis_url)
+        try:
+            votes = [n.build_inprepare1_fields(rid, value) for n in nodes]
+            async with r.pipeline(transaction=False) as pipe:
+                for n, (stream, fields) in zip(nodes, votes):
+                    pipe.xadd(stream, fields)
+                    n.log_inprepare1_sent(fields)
+                await pipe.execute()
+        except BaseException:
+            # Don't leave the representatives blocking on votes that never came.
+            rep_task.cancel()
+            raise
+        logger.info(f"[SYSTEM] Published {len(votes)} InPrepare votes.")
+
+        rep_results = await rep_task
+        alerts = [alert for _, rep_alerts in rep_results for alert in rep_alerts]
+        if alerts:
+            async with r.pipeline(transaction=False) as pipe:
+                for alert in alerts:
+                    pipe.xadd(
+                        f"nbft:alerts:{alert.rid}:{alert.group_id}", alert.to_fields()
+                    )
+                await pipe.execute()
+            logger.info(f"[SYSTEM] Published {len(alerts)} representative alerts.")
         logger.info(f"\n")
         await asyncio.gather(
             *[n.verify_representative(rid) for n in nodes if n.id != n.rep_id]
@@ -60,4 +94,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())